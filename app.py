@@ -1,9 +1,21 @@
 ﻿import streamlit as st
 import pandas as pd
-import plotly.express as px
-import glob
+import numpy as np
+import io
 import os
 
+# Column types for traffic_analysis_report_*.csv; unlisted columns are not loaded
+DTYPES = {
+    'vehicle_type': 'category',
+    'direction': 'category',
+    'source_file': 'category',
+    'confidence': 'float32',
+}
+WANTED_COLUMNS = set(DTYPES) | {'timestamp'}
+
+# Above this many selected files, same-schema CSVs are merged as bytes before parsing
+BYTE_CONCAT_MIN_FILES = 8
+
 # Set page config
 st.set_page_config(
     page_title="ATCC Traffic Detection",
@@ -11,6 +23,18 @@ st.set_page_config(
     layout="wide"
 )
 
+@st.cache_data(ttl=5, show_spinner=False)
+def _find_data_files():
+    """Report CSVs in the working directory, newest first"""
+    csv_files = []
+    with os.scandir('.') as entries:
+        for entry in entries:
+            name = entry.name
+            if name.startswith('traffic_analysis_report_') and name.endswith('.csv'):
+                csv_files.append(name)
+    csv_files.sort(reverse=True)
+    return csv_files
+
 def load_sample_data():
     """Load sample data for demo purposes"""
     # Create sample data if no CSV files exist
@@ -22,6 +46,130 @@ def load_sample_data():
     }
     return pd.DataFrame(sample_data)
 
+def _read_report(source):
+    """Parse a report CSV (path or buffer) with the dashboard's column types"""
+    df = pd.read_csv(source, dtype=DTYPES, usecols=lambda c: c in WANTED_COLUMNS)
+    if 'timestamp' in df.columns:
+        df['timestamp'] = pd.to_datetime(df['timestamp'], format='ISO8601', errors='coerce')
+    return df
+
+# Per-file frames are held as shared resources: no pickle copy per lookup, and no
+# entry limit, so a large selection cannot evict its own files between reruns.
+# Stale (path, mtime) entries age out via the TTL. Callers must not mutate them.
+@st.cache_resource(ttl=3600, show_spinner=False)
+def _read_csv_cached(path, mtime):
+    """Parse a report CSV once per (path, mtime) instead of on every rerun"""
+    return _read_report(path)
+
+def _same_header(paths):
+    """True when every file starts with the same header line"""
+    headers = set()
+    for path in paths:
+        with open(path, 'rb') as f:
+            headers.add(f.readline().rstrip(b'\r\n'))
+    return len(headers) == 1
+
+# Shared like the per-file cache, and failures are returned rather than raised so
+# they are cached too: a rerun with the same (path, mtime) key does no file I/O.
+@st.cache_resource(ttl=3600, max_entries=16, show_spinner=False)
+def _read_concatenated(file_keys):
+    """Merge same-schema CSVs at the byte level and parse them in one pass.
+
+    Returns (df, None) on success, (None, None) when the headers differ and
+    (None, message) when reading or parsing fails.
+    """
+    paths = [path for path, _ in file_keys]
+    try:
+        if not _same_header(paths):
+            return None, None
+        buf = io.BytesIO()
+        for i, path in enumerate(paths):
+            with open(path, 'rb') as f:
+                if i:
+                    f.readline()  # skip the repeated header
+                data = f.read()
+            buf.write(data)
+            if data and not data.endswith(b'\n'):
+                buf.write(b'\n')
+        buf.seek(0)
+        return _read_report(buf), None
+    except Exception as e:
+        return None, str(e)
+
+@st.cache_resource(ttl=3600, max_entries=16, show_spinner=False)
+def _combine_files(file_keys):
+    """Merge reports keyed by (path, mtime) pairs; also returns the files that failed"""
+    frames = []
+    failed = []
+    for path, mtime in file_keys:
+        try:
+            frames.append(_read_csv_cached(path, mtime))
+        except Exception as e:
+            failed.append((path, str(e)))
+    if not frames:
+        return pd.DataFrame(), failed
+    df = pd.concat(frames, ignore_index=True)
+    # concat falls back to object when per-file categories differ; restore them
+    for col in ('vehicle_type', 'source_file', 'direction'):
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    return df, failed
+
+# Aggregates are keyed on data_key (the loaded (path, mtime) tuple); the frame is
+# passed as _df so Streamlit does not hash its contents on every rerun.
+@st.cache_data(show_spinner=False)
+def _vehicle_counts(data_key, _df):
+    """Detections per vehicle type"""
+    return _df['vehicle_type'].value_counts()
+
+@st.cache_data(show_spinner=False)
+def _source_counts_top10(data_key, _df):
+    """Detections for the ten busiest source files"""
+    return _df['source_file'].value_counts().head(10)
+
+@st.cache_data(show_spinner=False)
+def _confidence_histogram(data_key, _df, bins=20):
+    """Bin confidence scores server-side so only bin counts reach the browser"""
+    counts, edges = np.histogram(_df['confidence'].dropna().to_numpy(), bins=bins, range=(0, 1))
+    centers = 0.5 * (edges[:-1] + edges[1:])
+    return centers, counts
+
+@st.cache_data(show_spinner=False)
+def _table_view(data_key, display_cols, _df, rows=50):
+    """Materialized preview slice holding only the cells that get rendered"""
+    view = _df.loc[:, list(display_cols)].head(rows).copy()
+    for col in view.select_dtypes('category').columns:
+        view[col] = view[col].cat.remove_unused_categories()
+    return view
+
+# Plotly is imported inside the builders so a cold start does not pay for it
+def _plot_vehicle_pie(vehicle_counts):
+    import plotly.express as px
+    return px.pie(
+        values=vehicle_counts.values,
+        names=vehicle_counts.index,
+        title="Vehicle Type Distribution"
+    )
+
+def _plot_confidence_bar(centers, counts):
+    import plotly.express as px
+    fig = px.bar(
+        x=centers,
+        y=counts,
+        labels={'x': 'confidence', 'y': 'count'},
+        title="Confidence Score Distribution"
+    )
+    fig.update_traces(width=1 / len(counts))
+    return fig
+
+def _plot_source_bar(source_counts):
+    import plotly.express as px
+    return px.bar(
+        x=source_counts.index,
+        y=source_counts.values,
+        title="Top Source Files"
+    )
+
 def main():
     st.title("🚗 ATCC Traffic Detection Dashboard")
     st.markdown("Real-time traffic analysis and vehicle detection system")
@@ -31,11 +179,12 @@ def main():
     
     try:
         # Find CSV files
-        csv_files = glob.glob('traffic_analysis_report_*.csv')
+        csv_files = _find_data_files()
         
         if not csv_files:
             st.info("📊 Demo Mode: Using sample data. Upload CSV files for real data.")
             df = load_sample_data()
+            data_key = ('sample',)
         else:
             selected_files = st.sidebar.multiselect(
                 "Select data files:",
@@ -48,18 +197,36 @@ def main():
                 return
             
             # Load selected files
-            df = pd.DataFrame()
+            file_keys = []
             for file in selected_files:
                 try:
-                    temp_df = pd.read_csv(file)
-                    df = pd.concat([df, temp_df], ignore_index=True)
-                    st.sidebar.success(f"✅ Loaded {file}")
-                except Exception as e:
+                    file_keys.append((file, os.path.getmtime(file)))
+                except OSError as e:
                     st.sidebar.error(f"❌ Error loading {file}: {e}")
-            
+            data_key = tuple(file_keys)
+
+            df = None
+            if len(file_keys) > BYTE_CONCAT_MIN_FILES:
+                df, error = _read_concatenated(data_key)
+                if df is not None:
+                    st.sidebar.success(f"✅ Loaded {len(file_keys)} files")
+                elif error:
+                    st.sidebar.error(f"❌ Error loading merged files, reading individually: {error}")
+
+            if df is None:
+                # Parse and concatenate once, inside the cache
+                df, failed = _combine_files(data_key)
+                errors = dict(failed)
+                for file, _ in file_keys:
+                    if file in errors:
+                        st.sidebar.error(f"❌ Error loading {file}: {errors[file]}")
+                    else:
+                        st.sidebar.success(f"✅ Loaded {file}")
+
             if df.empty:
                 st.warning("No data loaded. Switching to demo mode.")
                 df = load_sample_data()
+                data_key = ('sample',)
         
         # Display metrics
         st.subheader("📊 Overview")
@@ -90,33 +257,18 @@ def main():
         
         with col1:
             # Vehicle distribution
-            vehicle_counts = df['vehicle_type'].value_counts()
-            fig1 = px.pie(
-                values=vehicle_counts.values, 
-                names=vehicle_counts.index, 
-                title="Vehicle Type Distribution"
-            )
+            fig1 = _plot_vehicle_pie(_vehicle_counts(data_key, df))
             st.plotly_chart(fig1, use_container_width=True)
         
         with col2:
             # Confidence distribution if available
             if 'confidence' in df.columns:
-                fig2 = px.histogram(
-                    df, 
-                    x='confidence',
-                    title="Confidence Score Distribution",
-                    nbins=20
-                )
+                fig2 = _plot_confidence_bar(*_confidence_histogram(data_key, df))
                 st.plotly_chart(fig2, use_container_width=True)
             else:
                 # Source file distribution
                 if 'source_file' in df.columns:
-                    source_counts = df['source_file'].value_counts().head(10)
-                    fig2 = px.bar(
-                        x=source_counts.index,
-                        y=source_counts.values,
-                        title="Top Source Files"
-                    )
+                    fig2 = _plot_source_bar(_source_counts_top10(data_key, df))
                     st.plotly_chart(fig2, use_container_width=True)
         
         # Data table
@@ -131,7 +283,7 @@ def main():
         if 'timestamp' in df.columns:
             display_cols.append('timestamp')
             
-        st.dataframe(df[display_cols].head(50), use_container_width=True)
+        st.dataframe(_table_view(data_key, tuple(display_cols), df), use_container_width=True, hide_index=True)
         
         # File upload for users to add their own data
         st.sidebar.subheader("Upload Your Data")
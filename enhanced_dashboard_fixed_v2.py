@@ -1,8 +1,19 @@
 ﻿import pandas as pd
+import numpy as np
 import os
 from datetime import datetime
 import json
 
+REPORT_DTYPES = {'vehicle_type': 'category', 'direction': 'category'}
+
+def read_report(path):
+    """Read one report CSV, preferring the multithreaded pyarrow parser"""
+    try:
+        return pd.read_csv(path, engine='pyarrow', dtype=REPORT_DTYPES)
+    except (ImportError, ValueError):
+        # pyarrow missing or unable to parse this file; use the default C parser
+        return pd.read_csv(path, dtype=REPORT_DTYPES)
+
 def enhanced_html_dashboard():
     print("Creating Enhanced HTML Dashboard...")
     
@@ -14,15 +25,17 @@ def enhanced_html_dashboard():
         return
     
     # Combine all data
-    df = pd.DataFrame()
+    frames = []
     for file in csv_files:
         try:
-            temp_df = pd.read_csv(file)
-            df = pd.concat([df, temp_df], ignore_index=True)
+            frames.append(read_report(file))
             print(f"Loaded {file}")
         except Exception as e:
             print(f"ERROR loading {file}: {e}")
     
+    # Concatenate once instead of re-copying the growing frame per file
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    
     if df.empty:
         print("ERROR: No data available for dashboard!")
         return
@@ -30,10 +43,13 @@ def enhanced_html_dashboard():
     print(f"SUCCESS: Loaded {len(df)} total records")
     
     # Process data
+    days_analyzed = 'N/A'
     if 'timestamp' in df.columns:
         df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
-        df['date'] = df['timestamp'].dt.date
         df['hour'] = df['timestamp'].dt.hour
+        # Quantize to whole days in one pass instead of building a datetime.date per row
+        days = df['timestamp'].dropna().to_numpy().astype('datetime64[D]')
+        days_analyzed = len(np.unique(days))
     
     # Generate statistics
     total_detections = len(df)
@@ -52,7 +68,7 @@ def enhanced_html_dashboard():
         hourly_data = "[]"
     
     # Create enhanced HTML content with fixed CSS
-    html_content = f"""<!DOCTYPE html>
+    html_head = f"""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -159,7 +175,7 @@ def enhanced_html_dashboard():
                 <div>Source Files</div>
             </div>
             <div class="stat-card">
-                <div class="stat-number">{df['date'].nunique() if 'date' in df.columns else 'N/A'}</div>
+                <div class="stat-number">{days_analyzed}</div>
                 <div>Days Analyzed</div>
             </div>
         </div>
@@ -177,39 +193,20 @@ def enhanced_html_dashboard():
         
         <div class="chart">
             <h3>Recent Detections</h3>
-            <table>
-                <thead>
-                    <tr>
-                        <th>Vehicle Type</th>
-                        <th>Confidence</th>
-                        <th>Source File</th>
-                        <th>Timestamp</th>
-                    </tr>
-                </thead>
-                <tbody>"""
+"""
 
-    # Add recent detections
-    recent_data = df.head(20)
-    for _, row in recent_data.iterrows():
-        confidence = row.get('confidence', 'N/A')
-        if isinstance(confidence, float):
-            confidence = f"{confidence:.2f}"
-        
-        timestamp = row.get('timestamp', 'N/A')
-        if pd.notna(timestamp) and timestamp != 'N/A':
-            timestamp = str(timestamp)[:19]
-        
-        html_content += f"""
-                    <tr>
-                        <td>{row['vehicle_type']}</td>
-                        <td>{confidence}</td>
-                        <td>{row['source_file']}</td>
-                        <td>{timestamp}</td>
-                    </tr>"""
+    # Add recent detections; to_html renders and escapes the rows in one pass
+    recent_data = df.head(20).reindex(columns=['vehicle_type', 'confidence', 'source_file', 'timestamp'])
+    if pd.api.types.is_datetime64_any_dtype(recent_data['timestamp']):
+        recent_data['timestamp'] = recent_data['timestamp'].dt.strftime('%Y-%m-%d %H:%M:%S')
+    recent_table = recent_data.rename(columns={
+        'vehicle_type': 'Vehicle Type',
+        'confidence': 'Confidence',
+        'source_file': 'Source File',
+        'timestamp': 'Timestamp',
+    }).to_html(index=False, escape=True, border=0, na_rep='N/A', float_format='{:.2f}'.format)
 
-    html_content += f"""
-                </tbody>
-            </table>
+    html_tail = f"""
         </div>
     </div>
 
@@ -286,6 +283,9 @@ def enhanced_html_dashboard():
 </body>
 </html>"""
 
+    # Assemble the page in a single join
+    html_content = "".join([html_head, recent_table, html_tail])
+
     # Save HTML file
     html_file = f"enhanced_traffic_dashboard_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
     with open(html_file, 'w', encoding='utf-8') as f:
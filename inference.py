@@ -3,13 +3,17 @@ ATCC Vehicle Detection - Inference Script
 """
 
 from ultralytics import YOLO
+import torch
 import cv2
 import matplotlib.pyplot as plt
 from pathlib import Path
 
 class VehicleDetector:
     def __init__(self, model_path):
+        # Accepts .pt weights or an exported TensorRT .engine
         self.model = YOLO(model_path)
+        # FP16 inference on CUDA; CPU has no fast half-precision path
+        self.half = torch.cuda.is_available()
         self.class_names = {
             0: '2-wheeler',
             1: '3-wheeler',
@@ -32,16 +36,18 @@ class VehicleDetector:
             source=image_path,
             conf=0.25,
             save=save,
-            save_txt=save
+            save_txt=save,
+            half=self.half
         )
         
         # Display results
         for r in results:
             if r.boxes is not None:
                 print(f"\nDetected {len(r.boxes)} vehicles:")
-                for box in r.boxes:
-                    cls = int(box.cls[0])
-                    conf = float(box.conf[0])
+                # One device-to-host copy per tensor rather than two per box
+                cls_ids = r.boxes.cls.int().cpu().tolist()
+                confs = r.boxes.conf.cpu().tolist()
+                for cls, conf in zip(cls_ids, confs):
                     name = self.class_names.get(cls, f'class_{cls}')
                     print(f"  - {name}: {conf:.2%}")
             
@@ -1,34 +1,71 @@
 ﻿# simple_dashboard.py - Simple HTML dashboard
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pv
+import glob
+import hashlib
+import json
 import os
+import string
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
-def generate_html_dashboard():
-    # Find detection files
-    csv_files = [f for f in os.listdir('.') if f.startswith('traffic_analysis_report_') and f.endswith('.csv')]
-    
-    if not csv_files:
-        print("❌ No detection files found!")
-        return
-    
-    # Load data
-    all_data = []
-    for file in csv_files:
-        try:
-            df = pd.read_csv(file)
-            df['source_file'] = file
-            all_data.append(df)
-        except Exception as e:
-            print(f"Warning: Could not load {file}: {e}")
-    
-    if not all_data:
-        print("❌ No data loaded!")
-        return
-    
-    df = pd.concat(all_data, ignore_index=True)
-    
-    # Generate HTML
-    html_content = f"""
+# Columns the dashboard renders; everything else in the reports is skipped at parse time.
+# Fixed types keep per-file tables concatenable without re-inference.
+REPORT_SCHEMA = pa.schema([
+    ('vehicle_type', pa.string()),
+    ('confidence', pa.float64()),
+    ('timestamp', pa.string()),
+])
+
+def read_report_table(path):
+    """Read one report CSV as an Arrow table tagged with its file name"""
+    try:
+        # Columns a report lacks come back as nulls rather than failing the file
+        table = pv.read_csv(path, convert_options=pv.ConvertOptions(
+            include_columns=REPORT_SCHEMA.names,
+            include_missing_columns=True,
+            column_types=REPORT_SCHEMA,
+        ))
+    except pa.ArrowInvalid:
+        # Malformed for the strict Arrow parser; retry with the default pandas engine,
+        # blanking confidence values that are not numbers
+        df = pd.read_csv(path, dtype=str).reindex(columns=REPORT_SCHEMA.names)
+        df['confidence'] = pd.to_numeric(df['confidence'], errors='coerce')
+        table = pa.Table.from_pandas(df, schema=REPORT_SCHEMA, preserve_index=False)
+    # Dictionary-encode the file name: one string plus int32 codes, read back as a pandas category
+    source_file = pa.DictionaryArray.from_arrays(
+        pa.array(np.zeros(table.num_rows, dtype=np.int32)),
+        pa.array([path], pa.string()),
+    )
+    return table.append_column('source_file', source_file)
+
+# Remembers which report set produced the last dashboard
+DASHBOARD_CACHE = '.dashboard_cache.json'
+
+def inputs_signature(csv_files):
+    """Fingerprint of the report set (names plus mtimes); None if a file vanished"""
+    try:
+        stamp = sorted((f, os.path.getmtime(f)) for f in csv_files)
+    except OSError:
+        return None
+    return hashlib.sha1(repr(stamp).encode()).hexdigest()
+
+def cached_dashboard(signature):
+    """Path of the last dashboard built from identical inputs, if it still exists"""
+    try:
+        with open(DASHBOARD_CACHE, encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+    html_file = cache.get('html_file')
+    if cache.get('signature') == signature and html_file and os.path.exists(html_file):
+        return html_file
+    return None
+
+# Static page shell; only the header carries per-run values
+_TEMPLATE_HEAD = string.Template("""
 <!DOCTYPE html>
 <html lang="en">
 <head>
@@ -36,154 +73,110 @@ def generate_html_dashboard():
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Traffic Detection Dashboard</title>
     <style>
-        body {{
+        body {
             font-family: Arial, sans-serif;
             margin: 0;
             padding: 20px;
             background-color: #f5f5f5;
-        }}
-        .header {{
+        }
+        .header {
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             color: white;
             padding: 30px;
             text-align: center;
             border-radius: 10px;
             margin-bottom: 30px;
-        }}
-        .metrics {{
+        }
+        .metrics {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
             gap: 20px;
             margin-bottom: 30px;
-        }}
-        .metric-card {{
+        }
+        .metric-card {
             background: white;
             padding: 20px;
             border-radius: 10px;
             box-shadow: 0 2px 10px rgba(0,0,0,0.1);
             text-align: center;
-        }}
-        .metric-value {{
+        }
+        .metric-value {
             font-size: 2em;
             font-weight: bold;
             color: #333;
-        }}
-        .metric-label {{
+        }
+        .metric-label {
             color: #666;
             margin-top: 5px;
-        }}
-        .chart-container {{
+        }
+        .chart-container {
             background: white;
             padding: 20px;
             border-radius: 10px;
             box-shadow: 0 2px 10px rgba(0,0,0,0.1);
             margin-bottom: 20px;
-        }}
-        table {{
+        }
+        table {
             width: 100%;
             border-collapse: collapse;
             background: white;
             border-radius: 10px;
             overflow: hidden;
             box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
-        th, td {{
+        }
+        th, td {
             padding: 12px;
             text-align: left;
             border-bottom: 1px solid #ddd;
-        }}
-        th {{
+        }
+        th {
             background-color: #f8f9fa;
             font-weight: bold;
-        }}
-        tr:hover {{
+        }
+        tr:hover {
             background-color: #f5f5f5;
-        }}
+        }
     </style>
 </head>
 <body>
     <div class="header">
         <h1>🚗 Traffic Detection Analytics</h1>
-        <p>Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+        <p>Generated on $generated_on</p>
     </div>
     
     <div class="metrics">
         <div class="metric-card">
-            <div class="metric-value">{len(df)}</div>
+            <div class="metric-value">$total_vehicles</div>
             <div class="metric-label">Total Vehicles</div>
         </div>
         <div class="metric-card">
-            <div class="metric-value">{df['vehicle_type'].nunique()}</div>
+            <div class="metric-value">$vehicle_types</div>
             <div class="metric-label">Vehicle Types</div>
         </div>
         <div class="metric-card">
-            <div class="metric-value">{df['source_file'].nunique()}</div>
+            <div class="metric-value">$data_files</div>
             <div class="metric-label">Data Files</div>
         </div>
-        {'<div class="metric-card"><div class="metric-value">' + f"{df['confidence'].mean():.2f}" + '</div><div class="metric-label">Avg Confidence</div></div>' if 'confidence' in df.columns else ''}
+        $confidence_card
     </div>
     
     <div class="chart-container">
         <h2>🚗 Vehicle Type Distribution</h2>
-        <table>
-            <thead>
-                <tr>
-                    <th>Vehicle Type</th>
-                    <th>Count</th>
-                    <th>Percentage</th>
-                </tr>
-            </thead>
-            <tbody>
-"""
+""")
 
-    # Add vehicle type rows
-    vehicle_counts = df['vehicle_type'].value_counts()
-    total_vehicles = len(df)
-    
-    for vehicle_type, count in vehicle_counts.items():
-        percentage = (count / total_vehicles) * 100
-        html_content += f"""
-                <tr>
-                    <td>{vehicle_type}</td>
-                    <td>{count}</td>
-                    <td>{percentage:.1f}%</td>
-                </tr>
-"""
-    
-    html_content += """
-            </tbody>
-        </table>
+_CONFIDENCE_CARD = string.Template(
+    '<div class="metric-card"><div class="metric-value">$avg_confidence</div>'
+    '<div class="metric-label">Avg Confidence</div></div>'
+)
+
+_TEMPLATE_MID = """
     </div>
     
     <div class="chart-container">
         <h2>📊 Recent Detections</h2>
-        <table>
-            <thead>
-                <tr>
-                    <th>Vehicle Type</th>
-                    <th>Confidence</th>
-                    <th>Source File</th>
-                    <th>Timestamp</th>
-                </tr>
-            </thead>
-            <tbody>
-"""
-    
-    # Add recent detections
-    recent_data = df.head(20)
-    for _, row in recent_data.iterrows():
-        html_content += f"""
-                <tr>
-                    <td>{row['vehicle_type']}</td>
-                    <td>{row.get('confidence', 'N/A')}</td>
-                    <td>{row['source_file']}</td>
-                    <td>{row.get('timestamp', 'N/A')}</td>
-                </tr>
 """
-    
-    html_content += """
-            </tbody>
-        </table>
+
+_TEMPLATE_TAIL = """
     </div>
     
     <div style="text-align: center; margin-top: 30px; color: #666;">
@@ -192,11 +185,88 @@ def generate_html_dashboard():
 </body>
 </html>
 """
+
+def generate_html_dashboard():
+    # Find detection files
+    csv_files = glob.glob('traffic_analysis_report_*.csv')
+    
+    if not csv_files:
+        print("❌ No detection files found!")
+        return
+    
+    # Nothing changed since the last build: point at that dashboard instead of re-rendering
+    signature = inputs_signature(csv_files)
+    previous = cached_dashboard(signature) if signature else None
+    if previous:
+        print(f"✅ No new detection data; latest dashboard is still {previous}")
+        return
+    
+    # One clock read so the header timestamp matches the file name
+    now = datetime.now()
+    generated_on = now.strftime('%Y-%m-%d %H:%M:%S')
+    html_file = f"traffic_dashboard_{now.strftime('%Y%m%d_%H%M%S')}.html"
+    
+    # Load data; the CSV parsers release the GIL, so files are read concurrently
+    def load(file):
+        try:
+            return read_report_table(file)
+        except Exception as e:
+            print(f"Warning: Could not load {file}: {e}")
+            return None
+    
+    with ThreadPoolExecutor(max_workers=min(8, len(csv_files))) as executor:
+        tables = [table for table in executor.map(load, csv_files) if table is not None]
+    # Only a build from every report may be reused; otherwise the warnings would be hidden next run
+    cacheable = signature is not None and len(tables) == len(csv_files)
+    
+    if not tables:
+        print("❌ No data loaded!")
+        return
+    
+    # Concatenate in Arrow (no copy, no type re-inference) and convert to pandas once.
+    # split_blocks skips consolidating columns into 2-D blocks, and self_destruct frees
+    # each Arrow column as it is converted, so peak memory stays near one copy.
+    table = pa.concat_tables(tables)
+    del tables
+    df = table.to_pandas(split_blocks=True, self_destruct=True)
+    del table
+    
+    # Generate HTML
+    if df['confidence'].notna().any():
+        confidence_card = _CONFIDENCE_CARD.substitute(avg_confidence=f"{df['confidence'].mean():.2f}")
+    else:
+        confidence_card = ''
+    html_head = _TEMPLATE_HEAD.substitute(
+        generated_on=generated_on,
+        total_vehicles=len(df),
+        vehicle_types=df['vehicle_type'].nunique(),
+        data_files=df['source_file'].nunique(),
+        confidence_card=confidence_card,
+    )
+
+    # Vehicle type table, rendered in one to_html pass
+    vehicle_counts = df['vehicle_type'].value_counts()
+    vehicle_pcts = vehicle_counts.div(len(df)).mul(100)
+    
+    counts_df = pd.DataFrame({
+        'Count': vehicle_counts,
+        'Percentage': vehicle_pcts.map('{:.1f}%'.format),
+    }).rename_axis('Vehicle Type').reset_index()
+    
+    # Add recent detections
+    recent_data = df.head(20).reindex(columns=['vehicle_type', 'confidence', 'source_file', 'timestamp'])
+    recent_data.columns = ['Vehicle Type', 'Confidence', 'Source File', 'Timestamp']
     
-    # Save HTML file
-    html_file = f"traffic_dashboard_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
-    with open(html_file, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    # Save HTML file, streaming the tables straight into the buffered file handle
+    with open(html_file, 'w', encoding='utf-8', buffering=1 << 20) as f:
+        f.write(html_head)
+        counts_df.to_html(buf=f, index=False, border=0)
+        f.write(_TEMPLATE_MID)
+        recent_data.to_html(buf=f, index=False, border=0, na_rep='N/A')
+        f.write(_TEMPLATE_TAIL)
+    if cacheable:
+        with open(DASHBOARD_CACHE, 'w', encoding='utf-8') as f:
+            json.dump({'signature': signature, 'html_file': html_file}, f)
     
     print(f"✅ HTML Dashboard created: {html_file}")
     print("🌐 Open this file in your web browser to view the dashboard")
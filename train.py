@@ -4,17 +4,41 @@ ATCC Vehicle Detection - Training Script
 
 from ultralytics import YOLO
 import argparse
-import yaml
+import os
+import torch
 
-def train_model(data_yaml='configs/data.yaml', model_size='s', epochs=100):
+def train_model(data_yaml='configs/data.yaml', model_size='s', epochs=100, device=None, amp=True,
+                workers=None, cache='ram', batch=None, imgsz=640):
     """Train YOLOv8 model for vehicle detection"""
     
+    # Each dataloader worker runs its own augmentation; more than the core count only adds contention
+    if workers is None:
+        workers = min(16, os.cpu_count() or 1)
+    
+    # Prefer the first GPU; mixed precision only applies on CUDA
+    if device is None:
+        device = 0 if torch.cuda.is_available() else 'cpu'
+    on_gpu = str(device) != 'cpu'
+    amp = amp and on_gpu
+    if on_gpu:
+        # Let cuDNN autotune conv algorithms for the fixed training image size
+        torch.backends.cudnn.benchmark = True
+    
+    # -1 lets Ultralytics pick the largest batch that fits in ~60% of GPU memory
+    if batch is None:
+        batch = -1 if on_gpu else 4
+    if batch > 128:
+        print(f"WARNING: batch={batch} with the default learning rate; scale lr0 linearly with batch size")
+    
     print("=" * 60)
     print("ATCC VEHICLE DETECTION TRAINING")
     print("=" * 60)
     print(f"Model: yolov8{model_size}.pt")
     print(f"Classes: 11 vehicle types")
     print(f"Epochs: {epochs}")
+    print(f"Device: {device} (AMP {'on' if amp else 'off'})")
+    print(f"Batch: {'auto' if batch == -1 else batch}, image size: {imgsz}")
+    print(f"Workers: {workers}, cache: {cache or 'off'}")
     print("=" * 60)
     
     # Load model
@@ -24,10 +48,13 @@ def train_model(data_yaml='configs/data.yaml', model_size='s', epochs=100):
     results = model.train(
         data=data_yaml,
         epochs=epochs,
-        imgsz=640,
-        batch=16,
-        workers=4,
-        device='cpu',  # Change to 'cuda' if you have GPU
+        imgsz=imgsz,
+        batch=batch,
+        workers=workers,
+        cache=cache,
+        device=device,
+        amp=amp,
+        deterministic=not on_gpu,  # deterministic mode disables cuDNN autotuning
         name=f'atcc_yolov8{model_size}',
         save=True,
         save_period=10,
@@ -46,6 +73,14 @@ if __name__ == "__main__":
     parser.add_argument('--data', default='configs/data.yaml', help='Data config')
     parser.add_argument('--model', choices=['n','s','m','l','x'], default='s', help='Model size')
     parser.add_argument('--epochs', type=int, default=100, help='Training epochs')
+    parser.add_argument('--device', default=None, help="CUDA device(s) e.g. 0 or 0,1, or 'cpu' (default: auto)")
+    parser.add_argument('--amp', action=argparse.BooleanOptionalAction, default=True, help='Mixed precision on CUDA')
+    parser.add_argument('--workers', type=int, default=None, help='Dataloader workers (default: min(16, CPU count))')
+    parser.add_argument('--cache', choices=['ram', 'disk', 'none'], default='ram', help="Image cache; use 'disk' if the dataset does not fit in RAM")
+    parser.add_argument('--batch', type=int, default=None, help='Batch size, -1 for auto (default: -1 on GPU, 4 on CPU)')
+    parser.add_argument('--imgsz', type=int, default=640, help='Training image size')
     
     args = parser.parse_args()
-    train_model(args.data, args.model, args.epochs)
+    train_model(args.data, args.model, args.epochs, args.device, args.amp,
+                args.workers, False if args.cache == 'none' else args.cache,
+                args.batch, args.imgsz)